@@ -1,31 +1,91 @@
+import json
 import os
 from typing import Optional, Tuple, Union
+
+import numpy as np
 from numpy import ndarray
 
-from rlgym.envs import Match
+# the base class is the one rlgym import that cannot be deferred; everything
+# else rlgym-related is imported lazily on first use so that spawned worker
+# processes do not pay for the factory modules and their rlgym_tools /
+# distrib_rl dependencies at import time
 from rlgym.gym import Gym as BaseRLGymEnvironment
-from rlgym.gamelaunch import LaunchPreference
-
-from gym import Env
-from gym.utils import seeding
-
-from rlgym.utils.terminal_conditions.common_conditions import TimeoutCondition, GoalScoredCondition
-from rlgym.utils.action_parsers import DiscreteAction
-from rlgym.utils.obs_builders import DefaultObs
-from rlgym.utils.reward_functions import DefaultReward
-from rlgym.utils.state_setters import DefaultState
-from .ActionParserFactory import build_action_parser_from_config
-from .ObsBuilderFactory import build_obs_builder_from_config
-from .RewardFunctionFactory import build_reward_function_from_config
-from .StateSetterFactory import build_state_setter_from_config
-from .TerminalConditionsFactory import build_terminal_conditions_from_config
-
-_match_config_parsers = {
-    "action_parser": build_action_parser_from_config,
-    "obs_builder": build_obs_builder_from_config,
-    "state_setter": build_state_setter_from_config,
-    "reward_function": build_reward_function_from_config,
-    "terminal_conditions": build_terminal_conditions_from_config,
+
+_match_config_parsers = None
+_argmin_int64 = None
+
+# agents per team-size unit, indexed by int(spawn_opponents)
+_per_step_mult = np.array([1, 2], dtype=np.int64)
+
+
+def _get_match_config_parsers():
+    """Returns the config-key-to-factory map, importing the factory modules
+    on first use."""
+    global _match_config_parsers
+
+    if _match_config_parsers is None:
+        from .ActionParserFactory import build_action_parser_from_config
+        from .ObsBuilderFactory import build_obs_builder_from_config
+        from .RewardFunctionFactory import build_reward_function_from_config
+        from .StateSetterFactory import build_state_setter_from_config
+        from .TerminalConditionsFactory import build_terminal_conditions_from_config
+
+        _match_config_parsers = {
+            "action_parser": build_action_parser_from_config,
+            "obs_builder": build_obs_builder_from_config,
+            "state_setter": build_state_setter_from_config,
+            "reward_function": build_reward_function_from_config,
+            "terminal_conditions": build_terminal_conditions_from_config,
+        }
+
+    return _match_config_parsers
+
+
+def _get_argmin_int64():
+    """Returns the scheduler's argmin kernel, importing (and, with numba
+    installed, compiling) it on first use."""
+    global _argmin_int64
+
+    if _argmin_int64 is None:
+        from ._scheduler import argmin_int64
+        _argmin_int64 = argmin_int64
+
+    return _argmin_int64
+
+
+def _default_match_kwargs():
+    """Returns a freshly-constructed set of default kwargs for the Match
+    constructor. A function rather than a module-level dict so that default
+    components are never shared between Match instances."""
+    from rlgym.utils.terminal_conditions.common_conditions import TimeoutCondition, GoalScoredCondition
+    from rlgym.utils.action_parsers import DiscreteAction
+    from rlgym.utils.obs_builders import DefaultObs
+    from rlgym.utils.reward_functions import DefaultReward
+    from rlgym.utils.state_setters import DefaultState
+
+    return {
+        "reward_function": DefaultReward(),
+        "terminal_conditions": [TimeoutCondition(225), GoalScoredCondition()],
+        "obs_builder": DefaultObs(),
+        "action_parser": DiscreteAction(),
+        "state_setter": DefaultState(),
+        "team_size": 1,
+        "tick_skip": 8,
+        "game_speed": 100,
+        "gravity": 1,
+        "boost_consumption": 1,
+        "spawn_opponents": False
+    }
+
+# config keys whose built objects can be swapped onto an existing Match
+# without reconstructing it, mapped to the Match attribute that holds them.
+# obs_builder is deliberately absent: Match derives observation_space from
+# the obs builder at construction, so changing it must take the rebuild path
+_match_component_attrs = {
+    "reward_function": "_reward_fn",
+    "terminal_conditions": "_terminal_conditions",
+    "action_parser": "_action_parser",
+    "state_setter": "_state_setter",
 }
 
 _match_kwarg_names = [
@@ -50,25 +110,61 @@ _env_kwarg_names = [
     "auto_minimize"
 ]
 
+# config keys consumed by this wrapper itself rather than by Match or the
+# underlying RLGym environment
+_wrapper_kwarg_names = [
+    "autoreset",
+    "obs_postprocess"
+]
+
 class RLGymEnvironment(BaseRLGymEnvironment):
     """The main Rocket League Gym class. It encapsulates the process of managing
     the RLGym environment according to a dynamic, declarative configuration.
 
+    The `team_size` and `spawn_opponents` config values may each be a list of
+    choices, in which case every reset picks the combination with the fewest
+    accumulated agent-steps so that experience stays balanced across team
+    compositions. The very first episode always runs the largest configured
+    composition so downstream consumers observe the maximum agent count up
+    front.
+
+    An `obs_postprocess` callable may be supplied in the config; it is applied
+    to every observation before it leaves :meth:`step` or :meth:`reset`. For
+    per-tick numeric work it should be a numba `@njit(cache=True)` function
+    taking and returning a C-contiguous float32 array; it is warmed once at
+    construction so any JIT compilation cost stays off the hot path.
+
     The methods are accessed publicly as "step", "reset", etc...
     """
 
-    _match: Match
+    _match: "Match"
 
     def __init__(self, **kwargs):
+        from rlgym.envs import Match
+
         self._config = kwargs
+        self._autoreset = kwargs.get("autoreset", True)
+        self._obs_postprocess = kwargs.get("obs_postprocess")
+        self._reset_impl = self._first_reset_impl
+        self._component_cache = {}
+        self._init_step_counter(kwargs)
+        self._select_initial_team_config()
+
         match_kwargs = self._parse_match_kwargs(kwargs)
         self._match = Match(**match_kwargs)
+        self._last_team_config = self._current_team_config()
         env_kwargs = self._parse_env_kwargs(kwargs)
 
         super().__init__(self._match, **env_kwargs)
 
-        self.observation_space = self._match.observation_space
+        self.observation_space = self._float32_space(self._match.observation_space)
         self.action_space = self._match.action_space
+        self._update_action_dtype()
+
+        # bound once so the hot path in step() skips the super() dispatch
+        self._gym_step = super().step
+
+        self._warm_obs_postprocess()
 
 
     def step(
@@ -78,7 +174,10 @@ class RLGymEnvironment(BaseRLGymEnvironment):
     ]:
         """Run one timestep of the environment's dynamics.
 
-        When end of episode is reached, you are responsible for calling :meth:`reset` to reset this environment's state.
+        When end of episode is reached, the environment resets itself and the returned observation is the initial
+        observation of the next episode; the terminal observation is preserved in `info["terminal_observation"]`.
+        Pass `autoreset=False` in the environment config to opt out, in which case you are responsible for calling
+        :meth:`reset` yourself.
         Accepts an action and returns either a tuple `(observation, reward, terminated, truncated, info)`, or a tuple
         (observation, reward, done, info). The latter is deprecated and will be removed in future versions.
 
@@ -106,7 +205,19 @@ class RLGymEnvironment(BaseRLGymEnvironment):
                 a certain timelimit was exceeded, or the physics simulation has entered an invalid state.
         """
 
-        obs, reward, done, info = super().step(action)
+        # a no-op returning the same object when the action is already
+        # C-contiguous with the right dtype; otherwise avoids strided reads
+        # and hidden copies inside the simulator
+        action = np.ascontiguousarray(action, dtype=self._action_dtype)
+
+        self._counters[self._spawn_idx, self._team_idx] += self._steps_to_add
+
+        obs, reward, done, info = self._gym_step(action)
+        obs = self._finalize_obs(obs)
+
+        if done and self._autoreset:
+            info["terminal_observation"] = obs
+            obs = self.reset(return_info=False)
 
         # Note: RLGym doesn't return a value for terminated, so we'll just
         # assume it's False
@@ -149,20 +260,300 @@ class RLGymEnvironment(BaseRLGymEnvironment):
                 the ``info`` returned by :meth:`step`.
         """
 
+        needs_rebuild = False
+
         if options is not None:
+            changed_keys = self._diff_config(self._config, options)
             self._config = options
 
-            if self._match is not None:
-                match_kwargs = self._parse_match_kwargs(self._config)
-                self._match.__init__(**match_kwargs)
+            if "autoreset" in changed_keys:
+                self._autoreset = options.get("autoreset", True)
+
+            if "obs_postprocess" in changed_keys:
+                self._obs_postprocess = options.get("obs_postprocess")
+                self._warm_obs_postprocess()
+
+            # wrapper keys are consumed above and never require Match work
+            changed_keys.difference_update(_wrapper_kwarg_names)
+
+            if self._match is not None and changed_keys:
+                if changed_keys <= _match_component_attrs.keys():
+                    # only hot-swappable components changed; assign them onto
+                    # the existing Match instead of reconstructing it
+                    for key in changed_keys:
+                        component = self._build_match_component(key)
 
-                self.observation_space = self._match.observation_space
-                self.action_space = self._match.action_space
+                        # Match.__init__ wraps a bare terminal condition in a
+                        # list before storing it; mirror that so hot-swap
+                        # accepts the same configs as the rebuild path
+                        if key == "terminal_conditions" and not isinstance(component, (list, tuple)):
+                            component = [component]
+
+                        setattr(self._match, _match_component_attrs[key], component)
+
+                        if key == "action_parser":
+                            self._match.action_space = component.get_action_space()
+                            self.action_space = self._match.action_space
+                            self._update_action_dtype()
+                else:
+                    if "team_size" in changed_keys or "spawn_opponents" in changed_keys:
+                        self._init_step_counter(self._config)
+
+                        if self._reset_impl == self._first_reset_impl:
+                            self._select_initial_team_config()
+
+                    needs_rebuild = True
+
+        if self._reset_impl():
+            needs_rebuild = True
+
+        if needs_rebuild:
+            match_kwargs = self._parse_match_kwargs(self._config)
+            self._match.__init__(**match_kwargs)
+            self._last_team_config = self._current_team_config()
+
+            self.observation_space = self._float32_space(self._match.observation_space)
+            self.action_space = self._match.action_space
+            self._update_action_dtype()
 
         if seed is not None:
+            from gym.utils import seeding
+
             self._np_random, seed = seeding.np_random(seed)
 
-        return super().reset(return_info=return_info)
+        if return_info:
+            obs, info = super().reset(return_info=True)
+            return self._finalize_obs(obs), info
+
+        return self._finalize_obs(super().reset(return_info=False))
+
+    def _init_step_counter(self, config):
+        """Builds the per-composition agent-step counters from the config's
+        `team_size` and `spawn_opponents` values, either of which may be a
+        single value or a list of choices.
+
+        Args:
+            config (dict): The config to read the team composition from.
+        """
+        team_size = config.get("team_size", 1)
+        spawn_opponents = config.get("spawn_opponents", False)
+
+        self._team_choices = tuple(team_size) if type(team_size) is list else (team_size,)
+        self._spawn_choices = tuple(spawn_opponents) if type(spawn_opponents) is list else (spawn_opponents,)
+
+        # the team-size index map and the count matrix are built once here so
+        # that selection in reset() is pure indexed argmin work, with no
+        # type checks or dict scans; the matrix rows are indexed by
+        # int(spawn_opponents) and a row simply stays zero when only one
+        # spawn choice is configured
+        self._team_index = {size: i for i, size in enumerate(self._team_choices)}
+        self._counters = np.zeros((2, len(self._team_choices)), dtype=np.int64)
+
+        # warm up the (possibly JIT-compiled) selection kernel here so the
+        # import and compilation costs are paid off the reset path
+        self._argmin = _get_argmin_int64()
+        self._argmin(self._counters[0])
+
+    def _select_initial_team_config(self):
+        """Selects the largest configured team composition, used for the very
+        first episode so downstream consumers observe the maximum agent count
+        up front."""
+        self._spawn_opponents = True if True in self._spawn_choices else self._spawn_choices[0]
+        self._team_size = max(self._team_choices)
+        self._update_team_config_caches()
+
+    def _first_reset_impl(self):
+        """The reset scheduling path for the very first reset only: the
+        initial (largest) composition selected in __init__ is kept, and the
+        steady-state path is bound for every subsequent reset, so the
+        first-reset check never runs again.
+
+        Returns:
+            bool: Whether the Match needs rebuilding; never on this path.
+        """
+        self._reset_impl = self._steady_reset_impl
+        return False
+
+    def _steady_reset_impl(self):
+        """The steady-state reset scheduling path: re-runs the balanced
+        selection and reports whether the composition changed.
+
+        Returns:
+            bool: Whether the Match needs rebuilding.
+        """
+        self._select_team_config()
+
+        return self._current_team_config() != self._last_team_config
+
+    def _current_team_config(self):
+        """Returns the selected composition as (blue_team_size,
+        orange_team_size)."""
+        return (self._team_size, self._team_size if self._spawn_opponents else 0)
+
+    def _select_team_config(self):
+        """Selects the (spawn_opponents, team_size) combination with the
+        fewest accumulated agent-steps."""
+        if len(self._spawn_choices) == 1:
+            spawn_opponents = self._spawn_choices[0]
+        else:
+            spawn_opponents = bool(self._argmin(self._counters.sum(axis=1)))
+
+        team_idx = self._argmin(self._counters[int(spawn_opponents)])
+
+        self._spawn_opponents = spawn_opponents
+        self._team_size = self._team_choices[team_idx]
+        self._update_team_config_caches()
+
+    def _update_action_dtype(self):
+        # only coerce the dtype for floating-point action spaces; integer
+        # spaces (e.g. discrete parsers) can legitimately receive
+        # float-encoded or NaN-padded actions that the parser interprets
+        # itself, so those must pass through with their dtype intact
+        dtype = getattr(self.action_space, "dtype", None)
+        self._action_dtype = dtype if dtype is not None and dtype.kind == "f" else None
+
+    def _update_team_config_caches(self):
+        # cached whenever the team composition changes so that step() does a
+        # single indexed increment instead of recomputing the increment and
+        # double-indexing the counters every tick
+        self._spawn_idx = int(self._spawn_opponents)
+        self._team_idx = self._team_index[self._team_size]
+        self._steps_to_add = self._team_size * _per_step_mult[self._spawn_idx]
+
+    def _warm_obs_postprocess(self):
+        if self._obs_postprocess is None:
+            return
+
+        obs_shape = getattr(self.observation_space, "shape", None)
+
+        if obs_shape:
+            # pay any JIT compilation cost now rather than on the first step
+            self._obs_postprocess(np.zeros(obs_shape, dtype=np.float32))
+
+    def _finalize_obs(self, obs):
+        """Applies the boundary transformations every outgoing observation
+        receives: the float32 cast and, when configured, the user's
+        obs_postprocess callable (applied element-wise to lists of per-agent
+        observations).
+
+        Args:
+            obs: The observation(s) returned by the underlying environment.
+
+        Returns:
+            The finalized observation(s).
+        """
+        obs = self._cast_obs(obs)
+
+        if self._obs_postprocess is None:
+            return obs
+
+        if isinstance(obs, list):
+            return [self._obs_postprocess(o) for o in obs]
+
+        return self._obs_postprocess(obs)
+
+    @staticmethod
+    def _cast_obs(obs):
+        """Casts float64 observations down to float32 so every downstream
+        copy into a learner moves half the bytes. Lists of per-agent
+        observations are cast element-wise; already-float32 arrays are
+        returned as-is.
+
+        Args:
+            obs: The observation(s) returned by the underlying environment.
+
+        Returns:
+            The observation(s), as float32 where they were float64.
+        """
+        if isinstance(obs, ndarray):
+            if obs.dtype == np.float64:
+                return obs.astype(np.float32)
+
+            return obs
+
+        if isinstance(obs, list):
+            return [RLGymEnvironment._cast_obs(o) for o in obs]
+
+        return obs
+
+    @staticmethod
+    def _float32_space(space):
+        """Returns the float32 equivalent of a float64 Box space, matching
+        the dtype of the observations :meth:`_cast_obs` produces. Any other
+        space is returned unchanged.
+
+        Args:
+            space: The observation space reported by the Match.
+        """
+        from gym.spaces import Box
+
+        if isinstance(space, Box) and space.dtype == np.float64:
+            return Box(
+                low=space.low.astype(np.float32),
+                high=space.high.astype(np.float32),
+                dtype=np.float32
+            )
+
+        return space
+
+    @staticmethod
+    def _diff_config(old_config, new_config):
+        """Returns the set of config keys whose values differ between the two
+        configs, treating a missing key as its default.
+
+        Args:
+            old_config (dict): The config currently in effect.
+            new_config (dict): The incoming config.
+
+        Returns:
+            Set: The keys whose values changed.
+        """
+        return {
+            key
+            for key in old_config.keys() | new_config.keys()
+            if old_config.get(key) != new_config.get(key)
+        }
+
+    def _build_match_component(self, key):
+        """Builds a single Match component from the current config, falling
+        back to the default when the config no longer specifies it.
+
+        Args:
+            key (str): The component's config key, e.g. "reward_function".
+
+        Returns:
+            The constructed component.
+        """
+        if key in self._config:
+            return self._build_cached_component(key, self._config[key])
+
+        return _default_match_kwargs()[key]
+
+    def _build_cached_component(self, key, value):
+        """Builds a Match component from its config value, reusing the
+        previously built object when the identical config value has been seen
+        before. The cache is per-instance, so components are never shared
+        across environments; reuse within an environment is safe because
+        components are (re)initialized from the game state on every episode.
+
+        Args:
+            key (str): The component's config key, e.g. "reward_function".
+            value: The component's config value.
+
+        Returns:
+            The constructed (or cached) component.
+        """
+        parser = _get_match_config_parsers()[key]
+
+        try:
+            cache_key = (key, json.dumps(value, sort_keys=True, default=str))
+        except TypeError:
+            return parser(value)
+
+        if cache_key not in self._component_cache:
+            self._component_cache[cache_key] = parser(value)
+
+        return self._component_cache[cache_key]
 
     def _parse_match_kwargs(self, config):
         """Parses the config and returns the kwargs for the Match constructor
@@ -173,30 +564,24 @@ class RLGymEnvironment(BaseRLGymEnvironment):
         Returns:
             Dict: The kwargs for the Match constructor.
         """
-        kwargs = {
-            "reward_function": DefaultReward(),
-            "terminal_conditions": [TimeoutCondition(225), GoalScoredCondition()],
-            "obs_builder": DefaultObs(),
-            "action_parser": DiscreteAction(),
-            "state_setter": DefaultState(),
-            "team_size": 1,
-            "tick_skip": 8,
-            "game_speed": 100,
-            "gravity": 1,
-            "boost_consumption": 1,
-            "spawn_opponents": False
-        }
+        kwargs = _default_match_kwargs()
+        config_parsers = _get_match_config_parsers()
 
         for key, value in config.items():
-            if key in _match_config_parsers:
-                kwargs[key] = _match_config_parsers[key](value)
+            if key in config_parsers:
+                kwargs[key] = self._build_cached_component(key, value)
             elif key in _match_kwarg_names:
                 kwargs[key] = value
-            elif key in _env_kwarg_names:
+            elif key in _env_kwarg_names or key in _wrapper_kwarg_names:
                 pass
             else:
                 raise ValueError(f"Unknown config key for environment `RocketLeague-v0`: {key}")
 
+        # the config values may be lists of choices; Match always receives the
+        # currently-selected composition
+        kwargs["team_size"] = self._team_size
+        kwargs["spawn_opponents"] = self._spawn_opponents
+
         return kwargs
 
     def _parse_env_kwargs(self, config):
@@ -204,6 +589,8 @@ class RLGymEnvironment(BaseRLGymEnvironment):
         # `auto_minimize` are the opposite of the actual RLGym defaults, however
         # they are consistent with the old implementation in distr-rl for the
         # RLGym environment
+        from rlgym.gamelaunch import LaunchPreference
+
         kwargs = {
             "pipe_id": os.getpid(),
             "launch_preference": LaunchPreference.EPIC,
@@ -216,7 +603,7 @@ class RLGymEnvironment(BaseRLGymEnvironment):
         for key, value in config.items():
             if key in _env_kwarg_names:
                 kwargs[key] = value
-            elif key in _match_kwarg_names:
+            elif key in _match_kwarg_names or key in _wrapper_kwarg_names:
                 pass
             else:
                 raise ValueError(f"Unknown config key for environment `RocketLeague-v0`: {key}")
@@ -0,0 +1,430 @@
+import multiprocessing as mp
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+
+def _buffer_views(obs_shm, rew_shm, flag_shm, num_envs, obs_shape):
+    """Builds ndarray views over the shared batch buffers.
+
+    Used by both the parent and the workers so that the memory layout is
+    defined in exactly one place.
+
+    Args:
+        obs_shm (SharedMemory): The observation buffer block.
+        rew_shm (SharedMemory): The reward buffer block.
+        flag_shm (SharedMemory): The terminated/truncated flags block.
+        num_envs (int): The number of environments sharing the buffers.
+        obs_shape (tuple): The per-environment observation shape.
+
+    Returns:
+        Tuple: (observations, rewards, flags) views, where flags has shape
+        (2, num_envs) holding the terminated and truncated rows.
+    """
+    observations = np.ndarray(
+        (num_envs,) + tuple(obs_shape), dtype=np.float32, buffer=obs_shm.buf
+    )
+    rewards = np.ndarray((num_envs,), dtype=np.float32, buffer=rew_shm.buf)
+    flags = np.ndarray((2, num_envs), dtype=np.bool_, buffer=flag_shm.buf)
+
+    return observations, rewards, flags
+
+
+def _worker(remote, parent_remote, config):
+    """Entry point for a child process owning a single RLGymEnvironment.
+
+    Loops on commands received over the pipe until told to close. The import
+    of RLGymEnvironment happens here so that spawned workers do not pay for it
+    until they actually need it.
+
+    When the parent has allocated shared batch buffers, step and reset results
+    are written directly into the worker's slice of those buffers and only the
+    info dict travels over the pipe.
+
+    Args:
+        remote (Connection): The worker's end of the pipe.
+        parent_remote (Connection): The parent's end of the pipe, closed
+            immediately in the child.
+        config (dict): The kwargs used to construct the RLGymEnvironment.
+    """
+    parent_remote.close()
+
+    from .RLGymEnvironment import RLGymEnvironment
+
+    env = RLGymEnvironment(**config)
+
+    shm_blocks = None
+    obs_buf = rew_buf = flag_buf = None
+    index = None
+
+    try:
+        while True:
+            cmd, data = remote.recv()
+
+            if cmd == "step":
+                obs, reward, terminated, truncated, info = env.step(data)
+
+                if obs_buf is None:
+                    remote.send((obs, reward, terminated, truncated, info))
+                else:
+                    obs_buf[index] = obs
+                    rew_buf[index] = reward
+                    flag_buf[0, index] = terminated
+                    flag_buf[1, index] = truncated
+                    remote.send(info)
+            elif cmd == "reset":
+                result = env.reset(**data)
+                obs, info = result if data["return_info"] else (result, None)
+
+                if obs_buf is None:
+                    remote.send(result)
+                else:
+                    obs_buf[index] = obs
+                    remote.send(info)
+            elif cmd == "attach_buffers":
+                from multiprocessing import shared_memory
+
+                obs_name, rew_name, flag_name, num_envs, obs_shape, index = data
+                shm_blocks = [
+                    shared_memory.SharedMemory(name=name)
+                    for name in (obs_name, rew_name, flag_name)
+                ]
+                obs_buf, rew_buf, flag_buf = _buffer_views(
+                    *shm_blocks, num_envs, obs_shape
+                )
+                remote.send(True)
+            elif cmd == "get_spaces":
+                remote.send((env.observation_space, env.action_space))
+            elif cmd == "close":
+                break
+            else:
+                raise ValueError(f"Unknown worker command: {cmd}")
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        env.close()
+        remote.close()
+
+        if shm_blocks is not None:
+            # drop the views before closing the blocks they point into
+            obs_buf = rew_buf = flag_buf = None
+
+            for block in shm_blocks:
+                block.close()
+
+
+class VecRLGymEnvironment:
+    """Runs several RLGymEnvironment instances in parallel, one per child
+    process, and exposes the split step_async/step_wait pattern so that a
+    training loop can overlap simulator ticks across all environments instead
+    of serializing them in a single process.
+
+    For fixed single-agent configurations (scalar `team_size == 1` with
+    `spawn_opponents` off) batch results are assembled in buffers preallocated
+    from the observation space: workers write their observations, rewards, and
+    flags directly into shared memory, so step_wait returns views over those
+    buffers with no per-step stacking or copying. Fixed multi-agent configs —
+    like observation spaces without a known shape — are stacked over the
+    pipes instead. List-valued `team_size`/`spawn_opponents` configs let the
+    per-environment schedulers drift apart, so their observation and reward
+    shapes diverge between environments; those configs return plain per-env
+    lists of observations and rewards rather than stacked ndarrays.
+
+    The methods are accessed publicly as "step_async", "step_wait", "reset",
+    etc...
+    """
+
+    def __init__(self, num_envs: int, blocking: bool = False, **config):
+        """
+        Args:
+            num_envs (int): The number of RLGymEnvironment instances to manage.
+            blocking (bool): If true, all environments are stepped sequentially
+                in the calling process instead of in child processes. Useful
+                for single-process debugging.
+            config: The kwargs forwarded to each RLGymEnvironment constructor.
+        """
+        self.num_envs = num_envs
+        self._blocking = blocking
+        self._waiting = False
+        self._closed = False
+        self._shm_blocks = None
+
+        if blocking:
+            from .RLGymEnvironment import RLGymEnvironment
+
+            self._envs = [RLGymEnvironment(**config) for _ in range(num_envs)]
+            self._pending_actions = None
+
+            self.observation_space = self._envs[0].observation_space
+            self.action_space = self._envs[0].action_space
+        else:
+            ctx = mp.get_context("spawn")
+            self._remotes = []
+            self._processes = []
+
+            for _ in range(num_envs):
+                parent_remote, child_remote = ctx.Pipe()
+                process = ctx.Process(
+                    target=_worker,
+                    args=(child_remote, parent_remote, config),
+                    daemon=True
+                )
+                process.start()
+                child_remote.close()
+
+                self._remotes.append(parent_remote)
+                self._processes.append(process)
+
+            self._remotes[0].send(("get_spaces", None))
+            self.observation_space, self.action_space = self._remotes[0].recv()
+
+        # list-valued team configs let the per-env schedulers pick different
+        # compositions, so per-env result shapes can diverge and cannot be
+        # batched into one ndarray at all
+        self._variable_composition = (
+            type(config.get("team_size", 1)) is list
+            or type(config.get("spawn_opponents", False)) is list
+        )
+
+        # the preallocated buffers require every step to produce one
+        # fixed-shape observation per environment, which only holds for a
+        # fixed single-agent composition; multi-agent and list-valued team
+        # configs return per-agent lists with episode-dependent shapes
+        single_agent = (
+            config.get("team_size", 1) == 1
+            and config.get("spawn_opponents", False) is False
+        )
+        obs_shape = getattr(self.observation_space, "shape", None)
+        self._use_buffers = single_agent and bool(obs_shape)
+
+        if not self._use_buffers:
+            return
+
+        if blocking:
+            self._obs_buf = np.empty((num_envs,) + tuple(obs_shape), dtype=np.float32)
+            self._rew_buf = np.empty(num_envs, dtype=np.float32)
+            self._flag_buf = np.empty((2, num_envs), dtype=np.bool_)
+        else:
+            from multiprocessing import shared_memory
+
+            itemsize = np.dtype(np.float32).itemsize
+            obs_bytes = num_envs * int(np.prod(obs_shape)) * itemsize
+
+            self._shm_blocks = [
+                shared_memory.SharedMemory(create=True, size=obs_bytes),
+                shared_memory.SharedMemory(create=True, size=num_envs * itemsize),
+                shared_memory.SharedMemory(create=True, size=2 * num_envs),
+            ]
+            self._obs_buf, self._rew_buf, self._flag_buf = _buffer_views(
+                *self._shm_blocks, num_envs, obs_shape
+            )
+
+            names = tuple(block.name for block in self._shm_blocks)
+
+            for index, remote in enumerate(self._remotes):
+                remote.send(("attach_buffers", names + (num_envs, obs_shape, index)))
+
+            for remote in self._remotes:
+                remote.recv()
+
+    def step_async(self, actions: ndarray):
+        """Dispatches one action to each environment without blocking.
+
+        Args:
+            actions (ndarray): A batch of actions, one per environment.
+        """
+        if self._blocking:
+            self._pending_actions = actions
+        else:
+            for remote, action in zip(self._remotes, actions):
+                remote.send(("step", action))
+
+        self._waiting = True
+
+    def step_wait(
+        self
+    ) -> Tuple[ndarray, ndarray, ndarray, ndarray, List[dict]]:
+        """Waits for all environments to finish the step dispatched by
+        :meth:`step_async` and returns the batched results.
+
+        When the shared batch buffers are in use, the returned arrays are
+        views over those buffers and are overwritten by the next step; copy
+        them if they need to outlive it. With list-valued team configs the
+        per-env shapes can diverge, so observations and rewards come back as
+        per-env lists instead of ndarrays.
+
+        Returns:
+            observations (ndarray): The observations, batched along axis 0.
+            rewards (ndarray): The rewards, one per environment.
+            terminateds (ndarray): The terminated flags, one per environment.
+            truncateds (ndarray): The truncated flags, one per environment.
+            infos (List[dict]): The info dict from each environment.
+        """
+        if not self._waiting:
+            raise RuntimeError("step_wait() called without a pending step_async()")
+
+        self._waiting = False
+
+        if self._blocking:
+            results = [
+                env.step(action)
+                for env, action in zip(self._envs, self._pending_actions)
+            ]
+            self._pending_actions = None
+
+            if not self._use_buffers:
+                return self._stack_step_results(results)
+
+            infos = []
+
+            for index, (obs, reward, terminated, truncated, info) in enumerate(results):
+                self._obs_buf[index] = obs
+                self._rew_buf[index] = reward
+                self._flag_buf[0, index] = terminated
+                self._flag_buf[1, index] = truncated
+                infos.append(info)
+        elif not self._use_buffers:
+            return self._stack_step_results([remote.recv() for remote in self._remotes])
+        else:
+            infos = [remote.recv() for remote in self._remotes]
+
+        return (
+            np.asarray(self._obs_buf),
+            np.asarray(self._rew_buf),
+            np.asarray(self._flag_buf[0]),
+            np.asarray(self._flag_buf[1]),
+            infos
+        )
+
+    def _stack_step_results(self, results):
+        # fallback path for configurations the shared buffers cannot serve;
+        # the only path that still copies per step
+        observations, rewards, terminateds, truncateds, infos = zip(*results)
+
+        if self._variable_composition:
+            # ragged per-env shapes cannot be stacked; hand back plain lists
+            observations, rewards = list(observations), list(rewards)
+        else:
+            observations = np.stack(observations)
+            rewards = np.asarray(rewards, dtype=np.float32)
+
+        return (
+            observations,
+            rewards,
+            np.asarray(terminateds, dtype=bool),
+            np.asarray(truncateds, dtype=bool),
+            list(infos)
+        )
+
+    def _batch_obs(self, observations):
+        if self._variable_composition:
+            return list(observations)
+
+        return np.stack(observations)
+
+    def step(
+        self, actions: ndarray
+    ) -> Tuple[ndarray, ndarray, ndarray, ndarray, List[dict]]:
+        """Steps all environments synchronously. Equivalent to
+        :meth:`step_async` immediately followed by :meth:`step_wait`.
+
+        Args:
+            actions (ndarray): A batch of actions, one per environment.
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        return_info: bool = False,
+        options: Optional[dict] = None,
+    ) -> Any:
+        """Resets every environment and returns the batched initial
+        observations.
+
+        Args:
+            seed (optional int): Forwarded to each environment's reset.
+            return_info (bool): If true, also return the per-environment info.
+            options (optional dict): Forwarded to each environment's reset.
+
+        Returns:
+            observations (ndarray): The initial observations, batched along
+                axis 0, or a per-env list with list-valued team configs.
+            infos (optional List[dict]): Only returned if ``return_info=True``.
+        """
+        reset_kwargs = {
+            "seed": seed,
+            "return_info": return_info,
+            "options": options
+        }
+
+        if self._blocking:
+            results = [env.reset(**reset_kwargs) for env in self._envs]
+
+            if self._use_buffers:
+                infos = []
+
+                for index, result in enumerate(results):
+                    obs, info = result if return_info else (result, None)
+                    self._obs_buf[index] = obs
+                    infos.append(info)
+
+                observations = np.asarray(self._obs_buf)
+            elif return_info:
+                observations_list, infos = zip(*results)
+                observations, infos = self._batch_obs(observations_list), list(infos)
+            else:
+                observations = self._batch_obs(results)
+        else:
+            for remote in self._remotes:
+                remote.send(("reset", reset_kwargs))
+
+            results = [remote.recv() for remote in self._remotes]
+
+            if self._use_buffers:
+                observations, infos = np.asarray(self._obs_buf), results
+            elif return_info:
+                observations_list, infos = zip(*results)
+                observations, infos = self._batch_obs(observations_list), list(infos)
+            else:
+                observations = self._batch_obs(results)
+
+        if return_info:
+            return observations, infos
+
+        return observations
+
+    def close(self):
+        """Closes all environments and, in the multiprocess case, joins the
+        worker processes and releases the shared buffers."""
+        if self._closed:
+            return
+
+        if self._blocking:
+            for env in self._envs:
+                env.close()
+        else:
+            if self._waiting:
+                for remote in self._remotes:
+                    remote.recv()
+
+            for remote in self._remotes:
+                remote.send(("close", None))
+
+            for remote in self._remotes:
+                remote.close()
+
+            for process in self._processes:
+                process.join()
+
+            if self._shm_blocks is not None:
+                self._obs_buf = self._rew_buf = self._flag_buf = None
+
+                for block in self._shm_blocks:
+                    block.close()
+                    block.unlink()
+
+        self._closed = True
@@ -0,0 +1,27 @@
+"""Compiled helper for the team-composition scheduler.
+
+Numba is an optional dependency: when it is available the kernel below is JIT
+compiled with on-disk caching, so re-imports skip recompilation; otherwise the
+plain numpy implementation is used unchanged.
+"""
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def argmin_int64(counts):
+    """Returns the index of the smallest entry of a 1-D int64 count array.
+
+    Args:
+        counts (ndarray): The accumulated agent-step counts.
+
+    Returns:
+        int: The index of the minimum count.
+    """
+    return int(counts.argmin())
+
+
+if njit is not None:
+    argmin_int64 = njit(cache=True)(argmin_int64)
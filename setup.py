@@ -23,7 +23,7 @@ setup(
         'rlgym==1.2.0',
         'rlgym-tools==1.7.0',
     ],
-    python_requires='>=3.7',
+    python_requires='>=3.8',
     license='Apache 2.0',
     license_file='LICENSE',
     keywords=['rocket-league', 'reinforcement-learning', 'reinforcement-learning-algorithms', 'gym', 'machine-learning'],